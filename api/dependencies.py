@@ -10,6 +10,7 @@ from services.document_loader import DocumentLoader
 from utils.text_splitter import TextSplitter
 from core.vector_store import VectorStore
 from services.llm_service import LLMService
+from config.settings import Settings
 
 # Singleton instances - initialized once when the module is first imported
 _document_loader: DocumentLoader = None
@@ -39,6 +40,11 @@ def get_vector_store() -> VectorStore:
     global _vector_store
     if _vector_store is None:
         _vector_store = VectorStore()
+        if Settings.SNAPSHOT_PATH:
+            _vector_store.import_snapshot(Settings.SNAPSHOT_PATH)
+        else:
+            # Serve an index persisted by a previous upload or `python -m ingest`
+            _vector_store.load_db()
     return _vector_store
 
 
@@ -8,6 +8,11 @@ Run with: uvicorn api.main:app --reload
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+try:
+    from brotli_asgi import BrotliMiddleware
+except (ImportError, ModuleNotFoundError):
+    BrotliMiddleware = None
 
 from api.routes import router
 from api.dependencies import init_services
@@ -34,6 +39,13 @@ app = FastAPI(
     lifespan=lifespan,
 )
 
+# Compress responses: Brotli when the client supports it (falls back to gzip),
+# plain gzip if brotli-asgi is not installed
+if BrotliMiddleware is not None:
+    app.add_middleware(BrotliMiddleware, minimum_size=500, gzip_fallback=True)
+else:
+    app.add_middleware(GZipMiddleware, minimum_size=500)
+
 # Configure CORS for frontend access
 app.add_middleware(
     CORSMiddleware,
@@ -5,13 +5,15 @@ FastAPI route definitions for the RAG system.
 Provides endpoints for:
 - Uploading PDF documents
 - Querying the RAG system
+- Fetching the full text of a source chunk
+- Inspecting LLM provider latency statistics
 """
 
 import os
 import shutil
 from fastapi import APIRouter, UploadFile, File, Form, HTTPException
 from pydantic import BaseModel
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Literal
 
 from api.dependencies import (
     get_document_loader,
@@ -19,6 +21,7 @@ from api.dependencies import (
     get_vector_store,
     get_llm_service,
 )
+from utils.snippets import query_terms, make_snippet
 
 router = APIRouter()
 
@@ -26,9 +29,10 @@ router = APIRouter()
 # --- Response Models ---
 class SourceInfo(BaseModel):
     """Information about a source chunk."""
+    chunk_id: int
     page: int | str
     source_file: str
-    content: str
+    content: str | None = None  # Full text, snippet, or omitted (see `sources`)
 
 
 class QueryResponse(BaseModel):
@@ -39,6 +43,14 @@ class QueryResponse(BaseModel):
     sources: List[SourceInfo]
 
 
+class ChunkResponse(BaseModel):
+    """Response model for the chunk endpoint."""
+    chunk_id: int
+    page: int | str
+    source_file: str
+    content: str
+
+
 class UploadResponse(BaseModel):
     """Response model for the upload endpoint."""
     message: str
@@ -100,8 +112,11 @@ async def upload_pdf(file: UploadFile = File(...)):
     )
 
 
-@router.post("/query", response_model=QueryResponse)
-async def query_rag(query: str = Form(...)):
+@router.post("/query", response_model=QueryResponse, response_model_exclude_none=True)
+async def query_rag(
+    query: str = Form(...),
+    sources: Literal["full", "snippet", "ids"] = Form("full"),
+):
     """
     Query the RAG system with a question about the uploaded PDF.
 
@@ -112,6 +127,10 @@ async def query_rag(query: str = Form(...)):
 
     Args:
         query: The user's question (form data).
+        sources: How much of each source chunk to return (form data):
+            "full" for the whole text, "snippet" for a highlighted window
+            around the matched terms, or "ids" for metadata only. Use
+            GET /chunks/{chunk_id} to fetch the full text on demand.
 
     Returns:
         QueryResponse: The answer and sources with metadata.
@@ -119,7 +138,7 @@ async def query_rag(query: str = Form(...)):
     vector_store = get_vector_store()
     llm_service = get_llm_service()
 
-    if vector_store.vector_db is None:
+    if vector_store.chunk_store is None:
         raise HTTPException(
             status_code=400,
             detail="No document has been uploaded yet. Please upload a PDF first.",
@@ -142,13 +161,21 @@ async def query_rag(query: str = Form(...)):
         )
 
     # Build sources list with metadata
-    sources = []
+    terms = query_terms(query, rewritten_query) if sources == "snippet" else []
+    source_infos = []
     for result in search_results:
-        sources.append(
+        if sources == "full":
+            content = result.page_content  # Full text
+        elif sources == "snippet":
+            content = make_snippet(result.page_content, terms)
+        else:
+            content = None
+        source_infos.append(
             SourceInfo(
+                chunk_id=result.metadata["chunk_id"],
                 page=result.metadata.get("page", "N/A"),
                 source_file=result.metadata.get("source_file", "N/A"),
-                content=result.page_content,  # Full text
+                content=content,
             )
         )
 
@@ -159,5 +186,49 @@ async def query_rag(query: str = Form(...)):
         original_query=query,
         rewritten_query=rewritten_query,
         answer=answer,
-        sources=sources
+        sources=source_infos
+    )
+
+
+@router.get("/chunks/{chunk_id}", response_model=ChunkResponse)
+async def get_chunk(chunk_id: int):
+    """
+    Fetch the full text of a source chunk returned by /query.
+
+    Chunk ids are only valid for the current index; uploading a new PDF
+    replaces them.
+
+    Args:
+        chunk_id: The chunk id from a query source.
+
+    Returns:
+        ChunkResponse: The chunk text and its metadata.
+    """
+    vector_store = get_vector_store()
+
+    if vector_store.chunk_store is None:
+        raise HTTPException(
+            status_code=400,
+            detail="No document has been uploaded yet. Please upload a PDF first.",
+        )
+    if not 0 <= chunk_id < len(vector_store.chunk_store):
+        raise HTTPException(status_code=404, detail=f"Chunk {chunk_id} not found.")
+
+    document = vector_store.chunk_store.document(chunk_id)
+    return ChunkResponse(
+        chunk_id=chunk_id,
+        page=document.metadata.get("page", "N/A"),
+        source_file=document.metadata.get("source_file", "N/A"),
+        content=document.page_content,
     )
+
+
+@router.get("/llm/stats")
+async def llm_stats():
+    """
+    Per-provider LLM latency and error statistics recorded by the router.
+
+    Returns:
+        dict: provider -> cooldown state and per-model call counts, errors and latencies.
+    """
+    return get_llm_service().router.stats()
@@ -8,6 +8,51 @@ class Settings:
     GROQ_API_KEY = os.getenv("GROQ_API_KEY")
     OPENROUTER_API_KEY = os.getenv("OPENROUTER_API_KEY")
 
+    # Optional index snapshot to load at startup instead of re-ingesting PDFs
+    SNAPSHOT_PATH = os.getenv("SNAPSHOT_PATH")
+
     embeddings_model = "Alibaba-NLP/gte-multilingual-base"
+    embeddings_batch_size = 64  # Sentences per forward pass when embedding chunks
     # llm_model = "meta-llama/llama-4-scout-17b-16e-instruct"
-    llm_model = "openai/gpt-oss-120b"
\ No newline at end of file
+    llm_model = "openai/gpt-oss-120b"
+
+    # --- LLM routing ---
+    # All providers expose the OpenAI chat API. Override the base URLs to point
+    # at local mock servers when testing.
+    LLM_PROVIDERS = {
+        "groq": {
+            "base_url": os.getenv("GROQ_BASE_URL", "https://api.groq.com/openai/v1"),
+            "api_key": GROQ_API_KEY,
+        },
+        "openrouter": {
+            "base_url": os.getenv("OPENROUTER_BASE_URL", "https://openrouter.ai/api/v1"),
+            "api_key": OPENROUTER_API_KEY,
+        },
+    }
+
+    # Per-task (provider, model) candidates in order of preference. Providers
+    # slower than latency_budget (seconds) or rate-limiting are tried last.
+    LLM_TASKS = {
+        "rewrite": {
+            "models": [
+                ("groq", "llama-3.1-8b-instant"),
+                ("openrouter", "meta-llama/llama-3.1-8b-instruct"),
+            ],
+            "temperature": 0.7,
+            "timeout": 10,
+            "latency_budget": 2.0,
+        },
+        "answer": {
+            "models": [
+                ("openrouter", llm_model),
+                ("groq", "openai/gpt-oss-120b"),
+            ],
+            "temperature": 0.7,
+            "timeout": 90,
+            "latency_budget": 30.0,
+        },
+    }
+
+    llm_cooldown = 30            # Seconds a failing/rate-limited provider is demoted
+    llm_latency_alpha = 0.3      # Weight of the newest sample in the latency average
+    llm_latency_window = 300     # Seconds after which a slow provider gets retried
\ No newline at end of file
@@ -0,0 +1,168 @@
+# core/bm25_index.py
+import os
+import json
+import math
+from collections import Counter
+import numpy as np
+
+
+class BM25Index:
+    """
+    Okapi BM25 keyword index stored as flat NumPy arrays.
+
+    Scores exactly like rank_bm25's BM25Okapi, but keeps its statistics as an
+    inverted index (CSR postings per term) instead of one dict per document.
+    This keeps memory compact, only touches documents containing the query
+    terms, and lets the index be saved and memory-mapped back from disk.
+    """
+
+    INDEX_FILE = "index.json"
+    ARRAYS = ("idf", "indptr", "doc_ids", "tfs", "doc_len")
+
+    __slots__ = ("vocab", "idf", "indptr", "doc_ids", "tfs", "doc_len", "avgdl", "k1", "b", "_norm")
+
+    def __init__(self, vocab, idf, indptr, doc_ids, tfs, doc_len, avgdl, k1=1.5, b=0.75):
+        """
+        Initialize the index from precomputed statistics.
+
+        Args:
+            vocab (dict[str, int]): Maps each term to its term id.
+            idf (np.ndarray): IDF weight per term id.
+            indptr (np.ndarray): Postings of term t are doc_ids/tfs[indptr[t]:indptr[t + 1]].
+            doc_ids (np.ndarray): Document ids of all postings.
+            tfs (np.ndarray): Term frequencies of all postings.
+            doc_len (np.ndarray): Number of tokens per document.
+            avgdl (float): Average document length.
+            k1 (float): BM25 term frequency saturation.
+            b (float): BM25 length normalization.
+        """
+        self.vocab = vocab
+        self.idf = idf
+        self.indptr = indptr
+        self.doc_ids = doc_ids
+        self.tfs = tfs
+        self.doc_len = doc_len
+        self.avgdl = avgdl
+        self.k1 = k1
+        self.b = b
+        # Per-document denominator term, shared by every query
+        self._norm = k1 * (1 - b + b * np.asarray(doc_len, dtype=np.float32) / (avgdl or 1.0))
+
+    @classmethod
+    def build(cls, tokenized_docs, k1=1.5, b=0.75, epsilon=0.25):
+        """
+        Build an index from an iterable of token lists.
+
+        Args:
+            tokenized_docs (Iterable[list[str]]): The tokens of each document, in id order.
+            k1 (float): BM25 term frequency saturation.
+            b (float): BM25 length normalization.
+            epsilon (float): Floor for negative IDF values, as a fraction of the mean IDF.
+
+        Returns:
+            BM25Index: The built index.
+        """
+        vocab = {}
+        postings = []  # term id -> list of (doc id, tf)
+        doc_len = []
+        for doc_id, tokens in enumerate(tokenized_docs):
+            doc_len.append(len(tokens))
+            for term, tf in Counter(tokens).items():
+                term_id = vocab.setdefault(term, len(vocab))
+                if term_id == len(postings):
+                    postings.append([])
+                postings[term_id].append((doc_id, tf))
+
+        corpus_size = len(doc_len)
+        avgdl = (sum(doc_len) / corpus_size) if corpus_size else 0.0
+
+        # Same IDF as BM25Okapi, including the epsilon floor for common terms
+        idf = np.empty(len(vocab), dtype=np.float32)
+        for term_id, term_postings in enumerate(postings):
+            freq = len(term_postings)
+            idf[term_id] = math.log(corpus_size - freq + 0.5) - math.log(freq + 0.5)
+        if len(idf):
+            idf[idf < 0] = epsilon * float(idf.mean(dtype=np.float64))
+
+        indptr = np.zeros(len(vocab) + 1, dtype=np.int64)
+        indptr[1:] = np.cumsum([len(term_postings) for term_postings in postings])
+        doc_ids = np.empty(indptr[-1], dtype=np.int32)
+        tfs = np.empty(indptr[-1], dtype=np.int32)
+        for term_id, term_postings in enumerate(postings):
+            start = indptr[term_id]
+            for offset, (doc_id, tf) in enumerate(term_postings):
+                doc_ids[start + offset] = doc_id
+                tfs[start + offset] = tf
+
+        return cls(vocab, idf, indptr, doc_ids, tfs, np.asarray(doc_len, dtype=np.int32), avgdl, k1, b)
+
+    def __len__(self):
+        return len(self.doc_len)
+
+    def get_scores(self, query_tokens):
+        """
+        Score every document against the query.
+
+        Args:
+            query_tokens (list[str]): The tokenized query.
+
+        Returns:
+            np.ndarray: The BM25 score of each document.
+        """
+        scores = np.zeros(len(self), dtype=np.float32)
+        for term in query_tokens:
+            term_id = self.vocab.get(term)
+            if term_id is None:
+                continue
+            start, end = self.indptr[term_id], self.indptr[term_id + 1]
+            doc_ids = self.doc_ids[start:end]
+            tfs = self.tfs[start:end]
+            scores[doc_ids] += self.idf[term_id] * (tfs * (self.k1 + 1) / (tfs + self._norm[doc_ids]))
+        return scores
+
+    def top_k(self, query_tokens, k):
+        """Return the ids of the k best scoring documents, best first."""
+        scores = self.get_scores(query_tokens)
+        if k < len(scores):
+            candidates = np.argpartition(scores, -k)[-k:]
+        else:
+            candidates = np.arange(len(scores))
+        return [int(doc_id) for doc_id in candidates[np.argsort(scores[candidates])[::-1]]]
+
+    def save(self, path):
+        """
+        Write the index to a directory as .npy arrays plus a JSON header.
+
+        Args:
+            path (str): The directory to write to.
+        """
+        os.makedirs(path, exist_ok=True)
+        for name in self.ARRAYS:
+            np.save(os.path.join(path, f"{name}.npy"), getattr(self, name))
+
+        terms = [None] * len(self.vocab)
+        for term, term_id in self.vocab.items():
+            terms[term_id] = term
+        with open(os.path.join(path, self.INDEX_FILE), "w", encoding="utf-8") as f:
+            json.dump({"k1": self.k1, "b": self.b, "avgdl": self.avgdl, "terms": terms}, f)
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        """
+        Load an index written by save().
+
+        Args:
+            path (str): The directory to read from.
+            mmap (bool): Memory-map the arrays instead of reading them into memory.
+
+        Returns:
+            BM25Index: The loaded index.
+        """
+        with open(os.path.join(path, cls.INDEX_FILE), "r", encoding="utf-8") as f:
+            header = json.load(f)
+        arrays = {
+            name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r" if mmap else None)
+            for name in cls.ARRAYS
+        }
+        vocab = {term: term_id for term_id, term in enumerate(header["terms"])}
+        return cls(vocab, avgdl=header["avgdl"], k1=header["k1"], b=header["b"], **arrays)
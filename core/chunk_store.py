@@ -0,0 +1,280 @@
+# core/chunk_store.py
+import os
+import json
+import mmap
+import shutil
+from array import array
+from langchain_core.documents import Document
+
+NO_PAGE = -1
+NO_SOURCE = 0xFFFFFFFF
+
+
+class ChunkStore:
+    """
+    Compact on-disk storage for chunk text and metadata, addressed by integer id.
+
+    All chunk text lives in a single UTF-8 blob that is memory-mapped, so the
+    operating system pages it in on demand and shares it between workers.
+    Per-chunk metadata is kept in flat arrays (byte offsets, page numbers and
+    an index into an interned list of source file names) instead of one
+    Document object per chunk. Documents are only materialized for the
+    final top-k results of a search.
+    """
+
+    TEXT_FILE = "text.bin"
+    OFFSETS_FILE = "offsets.bin"
+    PAGES_FILE = "pages.bin"
+    SOURCES_FILE = "sources.bin"
+    META_FILE = "meta.json"
+    FILES = (TEXT_FILE, OFFSETS_FILE, PAGES_FILE, SOURCES_FILE, META_FILE)
+    VERSION = 1
+
+    __slots__ = (
+        "path",
+        "_offsets",
+        "_pages",
+        "_sources",
+        "_source_files",
+        "_source_index",
+        "_blob",
+    )
+
+    def __init__(self, path="db/chunk_store"):
+        """
+        Open (or create) a chunk store.
+
+        Args:
+            path (str): The directory holding the store files.
+        """
+        self.path = path
+        self._offsets = array("q", [0])  # n + 1 byte offsets into the text blob
+        self._pages = array("i")
+        self._sources = array("I")
+        self._source_files = []
+        self._source_index = {}
+        self._blob = None
+
+        os.makedirs(self.path, exist_ok=True)
+        if os.path.exists(self._file(self.META_FILE)):
+            self._load()
+
+    @classmethod
+    def build(cls, path, documents):
+        """
+        Create a fresh store at path from the given documents.
+
+        Any existing store at path is removed first.
+
+        Args:
+            path (str): The directory to write the store to.
+            documents (list[Document]): The chunks to store, in id order.
+
+        Returns:
+            ChunkStore: The newly built store.
+        """
+        if os.path.exists(path):
+            shutil.rmtree(path)
+        store = cls(path)
+        store.append(documents)
+        return store
+
+    def copy_to(self, path):
+        """
+        Copy the store files to another directory.
+
+        Args:
+            path (str): The destination directory.
+        """
+        os.makedirs(path, exist_ok=True)
+        for name in self.FILES:
+            if os.path.exists(self._file(name)):
+                shutil.copyfile(self._file(name), os.path.join(path, name))
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def _file(self, name):
+        return os.path.join(self.path, name)
+
+    def _load(self):
+        """Load the metadata arrays and memory-map the text blob."""
+        with open(self._file(self.META_FILE), "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("version") != self.VERSION:
+            raise ValueError(f"Unsupported chunk store version: {meta.get('version')}")
+
+        count = meta["count"]
+        self._source_files = meta["source_files"]
+        self._source_index = {name: i for i, name in enumerate(self._source_files)}
+
+        self._offsets = array("q")
+        self._pages = array("i")
+        self._sources = array("I")
+        with open(self._file(self.OFFSETS_FILE), "rb") as f:
+            self._offsets.fromfile(f, count + 1)
+        with open(self._file(self.PAGES_FILE), "rb") as f:
+            self._pages.fromfile(f, count)
+        with open(self._file(self.SOURCES_FILE), "rb") as f:
+            self._sources.fromfile(f, count)
+
+        self._map_blob()
+
+    def _map_blob(self):
+        """(Re)open the memory map over the text blob."""
+        if self._blob is not None:
+            self._blob.close()
+            self._blob = None
+        text_path = self._file(self.TEXT_FILE)
+        if os.path.exists(text_path) and os.path.getsize(text_path) > 0:
+            with open(text_path, "rb") as f:
+                self._blob = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def _write_tables(self):
+        """
+        Atomically replace each metadata array file.
+
+        _load only reads the first `count` entries of each table, so tables
+        that are longer than the committed count are harmless. Appends write
+        the tables before the meta file; truncations write the meta file first.
+        Either way the files on disk never hold fewer entries than meta.json says.
+        """
+        for name, table in (
+            (self.OFFSETS_FILE, self._offsets),
+            (self.PAGES_FILE, self._pages),
+            (self.SOURCES_FILE, self._sources),
+        ):
+            path = self._file(name)
+            with open(path + ".tmp", "wb") as f:
+                table.tofile(f)
+            os.replace(path + ".tmp", path)
+
+    def _write_meta(self):
+        """Atomically write meta.json, which commits the current chunk count."""
+        meta_path = self._file(self.META_FILE)
+        with open(meta_path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump({
+                "version": self.VERSION,
+                "count": len(self),
+                "source_files": self._source_files,
+            }, f)
+        os.replace(meta_path + ".tmp", meta_path)
+
+    def append(self, documents):
+        """
+        Append chunks to the store.
+
+        Args:
+            documents (list[Document]): The chunks to add.
+
+        Returns:
+            range: The integer ids assigned to the new chunks.
+        """
+        start_id = len(self)
+        end = self._offsets[-1]
+
+        if self._blob is not None:
+            self._blob.close()
+            self._blob = None
+        text_path = self._file(self.TEXT_FILE)
+        with open(text_path, "r+b" if os.path.exists(text_path) else "wb") as f:
+            # Discard any bytes left behind by an interrupted append
+            f.seek(end)
+            f.truncate()
+            for doc in documents:
+                data = doc.page_content.encode("utf-8")
+                f.write(data)
+                end += len(data)
+                self._offsets.append(end)
+
+                page = doc.metadata.get("page")
+                self._pages.append(page if isinstance(page, int) else NO_PAGE)
+
+                source_file = doc.metadata.get("source_file")
+                if source_file is None:
+                    self._sources.append(NO_SOURCE)
+                else:
+                    if source_file not in self._source_index:
+                        self._source_index[source_file] = len(self._source_files)
+                        self._source_files.append(source_file)
+                    self._sources.append(self._source_index[source_file])
+
+        self._write_tables()
+        self._write_meta()
+        self._map_blob()
+        return range(start_id, len(self))
+
+    def truncate(self, count):
+        """
+        Drop every chunk with an id >= count.
+
+        Used to roll back a partially written batch, e.g. when resuming an
+        interrupted bulk ingest.
+
+        Args:
+            count (int): The number of chunks to keep.
+        """
+        if count >= len(self):
+            return
+        del self._offsets[count + 1:]
+        del self._pages[count:]
+        del self._sources[count:]
+
+        # Commit the smaller count first, so the (still longer) files on disk
+        # stay readable if we crash before they are shrunk
+        self._write_meta()
+        self._write_tables()
+
+        if self._blob is not None:
+            self._blob.close()
+            self._blob = None
+        with open(self._file(self.TEXT_FILE), "r+b") as f:
+            f.truncate(self._offsets[-1])
+        self._map_blob()
+
+    def text(self, chunk_id):
+        """Return the text of a single chunk."""
+        start, end = self._offsets[chunk_id], self._offsets[chunk_id + 1]
+        if start == end:
+            return ""
+        return self._blob[start:end].decode("utf-8")
+
+    def iter_texts(self):
+        """Yield the text of every chunk in id order."""
+        for chunk_id in range(len(self)):
+            yield self.text(chunk_id)
+
+    def page(self, chunk_id):
+        """Return the page number of a chunk, or None if unknown."""
+        page = self._pages[chunk_id]
+        return None if page == NO_PAGE else page
+
+    def source_file(self, chunk_id):
+        """Return the source file name of a chunk, or None if unknown."""
+        source = self._sources[chunk_id]
+        return None if source == NO_SOURCE else self._source_files[source]
+
+    def metadata(self, chunk_id):
+        """Return the metadata dict of a chunk."""
+        metadata = {"chunk_id": chunk_id}
+        page = self.page(chunk_id)
+        if page is not None:
+            metadata["page"] = page
+        source_file = self.source_file(chunk_id)
+        if source_file is not None:
+            metadata["source_file"] = source_file
+        return metadata
+
+    def document(self, chunk_id):
+        """Materialize a single chunk as a LangChain Document."""
+        return Document(page_content=self.text(chunk_id), metadata=self.metadata(chunk_id))
+
+    def documents(self, chunk_ids):
+        """Materialize several chunks as LangChain Documents, preserving order."""
+        return [self.document(chunk_id) for chunk_id in chunk_ids]
+
+    def close(self):
+        """Release the memory map over the text blob."""
+        if self._blob is not None:
+            self._blob.close()
+            self._blob = None
@@ -1,35 +1,77 @@
 # core/vector_store.py
 import os
+import json
 import shutil
+import time
+import chromadb
+from chromadb.errors import ChromaError
+import numpy as np
 from langchain_huggingface import HuggingFaceEmbeddings
-from langchain_chroma import Chroma
-from langchain_community.vectorstores.utils import filter_complex_metadata
-from langchain_community.retrievers import BM25Retriever
-try:
-    from langchain.retrievers import EnsembleRetriever
-except (ImportError, ModuleNotFoundError):
-    try:
-        from langchain_community.retrievers import EnsembleRetriever
-    except (ImportError, ModuleNotFoundError):
-        from langchain_classic.retrievers.ensemble import EnsembleRetriever
 from config.settings import Settings
+from core.chunk_store import ChunkStore
+from core.bm25_index import BM25Index
+
+COLLECTION_NAME = "chunks"
+RRF_C = 60  # Same smoothing constant as LangChain's EnsembleRetriever
+
+SNAPSHOT_FORMAT = "smart-study-companion-snapshot"
+SNAPSHOT_VERSION = 1
+SNAPSHOT_MANIFEST = "manifest.json"
+SNAPSHOT_EMBEDDINGS = "embeddings.npy"
+SNAPSHOT_CHUNKS = "chunks"
+SNAPSHOT_BM25 = "bm25"
+
+
+def bm25_tokenize(text):
+    """Tokenizer used for the BM25 index (same as BM25Retriever's default)."""
+    return text.split()
+
+
+def reciprocal_rank_fusion(rankings, weights, c=RRF_C):
+    """
+    Merge several ranked lists of chunk ids with weighted Reciprocal Rank Fusion.
+
+    Args:
+        rankings (list[list[int]]): One ranked list of chunk ids per retriever.
+        weights (list[float]): The weight of each retriever.
+        c (int): The RRF smoothing constant.
+
+    Returns:
+        list[int]: The fused ranking of chunk ids, best first.
+    """
+    scores = {}
+    for ranking, weight in zip(rankings, weights):
+        for rank, chunk_id in enumerate(ranking, start=1):
+            scores[chunk_id] = scores.get(chunk_id, 0.0) + weight / (rank + c)
+    return sorted(scores, key=scores.get, reverse=True)
+
 
 class VectorStore:
     """
     Manages Hybrid Search using both Vector (Semantic) and BM25 (Keyword) retrieval.
-    
+
     Uses ChromaDB for semantic search and BM25 for keyword matching, combined with
     Reciprocal Rank Fusion (RRF) for optimal results.
+
+    Chunk text and metadata are held once, in a memory-mapped ChunkStore. Chroma
+    only stores embeddings keyed by chunk id and the BM25 index only keeps term
+    statistics, so both legs return integer ids and Documents are materialized
+    for the final top-k only.
+
+    The whole index can be exported as a portable snapshot and imported on
+    another node by memory-mapping it, without re-embedding any chunk.
     """
-    
-    def __init__(self, db_path="db/chroma_db") :
+
+    def __init__(self, db_path="db/chroma_db", chunk_store_path="db/chunk_store") :
         """
         Initialize the VectorStore.
 
         Args:
             db_path (str): The path to the persistent ChromaDB directory.
+            chunk_store_path (str): The path to the chunk text/metadata store.
         """
         self.db_path = db_path
+        self.chunk_store_path = chunk_store_path
 
         print("⏳ Loading Embedding Model (HuggingFace)...")
         self.embeddings = HuggingFaceEmbeddings(
@@ -38,60 +80,290 @@ class VectorStore:
                 'device': 'cpu',
                 'trust_remote_code': True # Trust remote code
             },
-            encode_kwargs={'normalize_embeddings': True}
-        )   
-        
-        self.vector_db = None
-        self.bm25_retriever = None
-        self.hybrid_retriever = None
-        self.documents = []  # Store documents for BM25
+            encode_kwargs={
+                'normalize_embeddings': True,
+                'batch_size': Settings.embeddings_batch_size
+            }
+        )
+
+        self.chroma_client = None
+        self.vector_db = None     # Chroma collection holding embeddings only
+        self.embedding_matrix = None  # Memory-mapped embeddings of an imported snapshot
+        self.bm25 = None          # BM25 term statistics over the chunk store
+        self.chunk_store = None   # Shared text/metadata store
+        self.weights = [0.5, 0.5] # Equal weight for semantic and keyword
 
     def create_db(self, documents):
         """
         Create a new hybrid search database from the provided documents.
 
-        Creates both:
-        1. Vector database (Chroma) for semantic search
-        2. BM25 retriever for keyword search
-        3. Ensemble retriever combining both with RRF
+        Creates:
+        1. Chunk store holding the text and metadata of every chunk
+        2. Vector database (Chroma) for semantic search
+        3. BM25 index for keyword search
 
         Clears any existing data at the db_path before creating the new store.
 
         Args:
             documents (list[Document]): The list of documents to index.
         """
-        if os.path.exists(self.db_path):
+        self.reset_db()
+
+        # 1 + 2. Store chunk text and embed it (Semantic Search)
+        print(f"🚀 Processing {len(documents)} chunks for semantic search...")
+        self.add_documents(documents)
+
+        # 3. Create BM25 Index (Keyword Search)
+        print(f"📊 Building BM25 index for keyword search...")
+        self._build_bm25()
+
+        print("✅ Hybrid search system ready (Semantic + BM25 + RRF)!")
+
+    def reset_db(self):
+        """Delete any existing data and open an empty chunk store and collection."""
+        if self.chroma_client is not None:
+            # Chroma caches clients per path, so deleting the directory under an
+            # open client leaves it writing to a removed SQLite file. Clear the
+            # collection through the client instead.
+            print(f"🧹 Clearing old data from {self.db_path}...")
+            try:
+                self.chroma_client.delete_collection(COLLECTION_NAME)
+            except (ValueError, ChromaError):
+                pass  # Collection did not exist yet
+        elif os.path.exists(self.db_path):
             print(f"🧹 Clearing old data from {self.db_path}...")
             shutil.rmtree(self.db_path)
-        
-        # Clean Metadata (to avoid errors with complex types)
-        cleaned_docs = filter_complex_metadata(documents)
-        self.documents = cleaned_docs  # Store for BM25
-        
-        # 1. Create Vector Store (Semantic Search)
-        print(f"🚀 Processing {len(cleaned_docs)} chunks for semantic search...")
-        self.vector_db = Chroma.from_documents(
-            documents=cleaned_docs,
-            embedding=self.embeddings,
-            persist_directory=self.db_path
+        if self.chunk_store is not None:
+            self.chunk_store.close()
+
+        self.chunk_store = ChunkStore.build(self.chunk_store_path, [])
+        self.vector_db = self._open_collection()
+        self.embedding_matrix = None
+        self.bm25 = None
+
+    def add_documents(self, documents, batch_size=None):
+        """
+        Append documents to the chunk store and their embeddings to Chroma.
+
+        The BM25 index is not updated; call load_db (or create_db) to rebuild it
+        once all documents have been added.
+
+        Args:
+            documents (list[Document]): The documents to add.
+            batch_size (int): Number of chunks embedded and written per Chroma
+                transaction. Defaults to Chroma's maximum batch size.
+
+        Returns:
+            range: The chunk ids assigned to the documents.
+        """
+        chunk_ids = self.chunk_store.append(documents)
+        self._add_embeddings(chunk_ids, batch_size)
+        return chunk_ids
+
+    def truncate(self, count):
+        """
+        Drop every chunk with an id >= count from the chunk store and Chroma.
+
+        Args:
+            count (int): The number of chunks to keep.
+        """
+        stale_ids = [str(chunk_id) for chunk_id in range(count, len(self.chunk_store))]
+        if stale_ids:
+            self.vector_db.delete(ids=stale_ids)
+        self.chunk_store.truncate(count)
+
+    def open_db(self):
+        """
+        Open the persisted chunk store and Chroma collection without building BM25.
+
+        Returns:
+            bool: True if a persisted database was found.
+        """
+        if not os.path.exists(self.db_path) or not os.path.exists(
+            os.path.join(self.chunk_store_path, ChunkStore.META_FILE)
+        ):
+            return False
+
+        self.chunk_store = ChunkStore(self.chunk_store_path)
+        self.vector_db = self._open_collection()
+        self.embedding_matrix = None
+        return True
+
+    def load_db(self):
+        """
+        Reopen a previously created database from disk.
+
+        Restores the Chroma collection and chunk store, and rebuilds the BM25
+        index from the stored chunk text.
+
+        Returns:
+            bool: True if a persisted database was found and loaded.
+        """
+        if not self.open_db():
+            return False
+
+        self._build_bm25()
+        print(f"📂 Loaded {len(self.chunk_store)} chunks from {self.db_path}.")
+        return True
+
+    def export_snapshot(self, path):
+        """
+        Export the index as a portable, versioned snapshot directory.
+
+        The snapshot contains:
+        - manifest.json: format version, embedding model id and sizes
+        - embeddings.npy: float32 matrix of chunk embeddings, row = chunk id
+        - chunks/: the chunk store (text blob and metadata arrays)
+        - bm25/: the BM25 statistics as .npy arrays
+
+        Any existing directory at path is replaced.
+
+        Args:
+            path (str): The directory to write the snapshot to.
+        """
+        if self.chunk_store is None and not self.load_db():
+            raise ValueError("No database found. Please upload a PDF first.")
+        if self.bm25 is None:
+            self._build_bm25()
+
+        count = len(self.chunk_store)
+        if count == 0:
+            raise ValueError("The index is empty; there is nothing to export.")
+
+        if os.path.exists(path):
+            shutil.rmtree(path)
+        os.makedirs(path)
+        print(f"📦 Exporting {count} chunks to snapshot {path}...")
+
+        # 1. Embeddings, written straight into a memory-mapped .npy file
+        if self.embedding_matrix is not None:
+            dim = self.embedding_matrix.shape[1]
+        else:
+            dim = len(self.vector_db.get(ids=["0"], include=["embeddings"])["embeddings"][0])
+        embeddings = np.lib.format.open_memmap(
+            os.path.join(path, SNAPSHOT_EMBEDDINGS), mode="w+", dtype=np.float32, shape=(count, dim)
         )
-        
-        # 2. Create BM25 Retriever (Keyword Search)
-        print(f"📊 Building BM25 index for keyword search...")
-        self.bm25_retriever = BM25Retriever.from_documents(cleaned_docs)
-        self.bm25_retriever.k = 10  # Return top 10 from BM25
-        
-        # 3. Create Hybrid Ensemble Retriever (RRF Combination)
-        print(f"🔗 Creating Hybrid Retriever with RRF...")
-        self.hybrid_retriever = EnsembleRetriever(
-            retrievers=[
-                self.vector_db.as_retriever(search_kwargs={"k": 10}),
-                self.bm25_retriever
-            ],
-            weights=[0.5, 0.5]  # Equal weight for semantic and keyword
+        if self.embedding_matrix is not None:
+            embeddings[:] = self.embedding_matrix
+        else:
+            batch_size = self.chroma_client.get_max_batch_size()
+            for start in range(0, count, batch_size):
+                ids = [str(chunk_id) for chunk_id in range(start, min(start + batch_size, count))]
+                result = self.vector_db.get(ids=ids, include=["embeddings"])
+                for chunk_id, embedding in zip(result["ids"], result["embeddings"]):
+                    embeddings[int(chunk_id)] = embedding
+        embeddings.flush()
+        del embeddings
+
+        # 2. Chunk text and metadata
+        self.chunk_store.copy_to(os.path.join(path, SNAPSHOT_CHUNKS))
+
+        # 3. BM25 statistics
+        self.bm25.save(os.path.join(path, SNAPSHOT_BM25))
+
+        # 4. Manifest last, so a partially written snapshot is never valid
+        with open(os.path.join(path, SNAPSHOT_MANIFEST), "w", encoding="utf-8") as f:
+            json.dump({
+                "format": SNAPSHOT_FORMAT,
+                "version": SNAPSHOT_VERSION,
+                "embeddings_model": Settings.embeddings_model,
+                "embedding_dim": dim,
+                "num_chunks": count,
+                "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            }, f, indent=2)
+
+        print("✅ Snapshot exported!")
+
+    def import_snapshot(self, path):
+        """
+        Load a snapshot written by export_snapshot.
+
+        Embeddings, chunk text and BM25 statistics are memory-mapped from the
+        snapshot directory, so the store is query-ready without re-embedding
+        any chunk. Semantic search runs directly against the embedding matrix.
+
+        Args:
+            path (str): The snapshot directory.
+        """
+        with open(os.path.join(path, SNAPSHOT_MANIFEST), "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+
+        if manifest.get("format") != SNAPSHOT_FORMAT or manifest.get("version") != SNAPSHOT_VERSION:
+            raise ValueError(
+                f"Unsupported snapshot format: {manifest.get('format')} v{manifest.get('version')}"
+            )
+        if manifest["embeddings_model"] != Settings.embeddings_model:
+            raise ValueError(
+                f"Snapshot was built with '{manifest['embeddings_model']}', "
+                f"but this node uses '{Settings.embeddings_model}'."
+            )
+
+        if self.chunk_store is not None:
+            self.chunk_store.close()
+        self.chunk_store = ChunkStore(os.path.join(path, SNAPSHOT_CHUNKS))
+        self.embedding_matrix = np.load(os.path.join(path, SNAPSHOT_EMBEDDINGS), mmap_mode="r")
+        self.bm25 = BM25Index.load(os.path.join(path, SNAPSHOT_BM25))
+        self.vector_db = None  # A Chroma client, if already open, is kept for reuse
+
+        num_chunks = manifest["num_chunks"]
+        if not (len(self.chunk_store) == len(self.embedding_matrix) == len(self.bm25) == num_chunks):
+            raise ValueError("Snapshot is inconsistent: chunk, embedding and BM25 counts differ.")
+
+        print(f"📂 Imported snapshot with {num_chunks} chunks from {path}.")
+
+    def _open_collection(self):
+        """Open (or create) the Chroma collection that holds the embeddings."""
+        if self.chroma_client is None:
+            self.chroma_client = chromadb.PersistentClient(path=self.db_path)
+        return self.chroma_client.get_or_create_collection(COLLECTION_NAME)
+
+    def _add_embeddings(self, chunk_ids, batch_size=None):
+        """Embed the given chunks and add them to Chroma in batches."""
+        chunk_ids = list(chunk_ids)
+        max_batch_size = self.chroma_client.get_max_batch_size()
+        batch_size = min(batch_size or max_batch_size, max_batch_size)
+        for start in range(0, len(chunk_ids), batch_size):
+            batch = chunk_ids[start:start + batch_size]
+            self.vector_db.add(
+                ids=[str(chunk_id) for chunk_id in batch],
+                embeddings=self.embeddings.embed_documents(
+                    [self.chunk_store.text(chunk_id) for chunk_id in batch]
+                ),
+            )
+
+    def _build_bm25(self):
+        """Build the BM25 index by streaming tokens from the chunk store."""
+        if len(self.chunk_store) == 0:
+            self.bm25 = None
+            return
+        self.bm25 = BM25Index.build(bm25_tokenize(text) for text in self.chunk_store.iter_texts())
+
+    def _semantic_search(self, query, k):
+        """Return the ids of the k nearest chunks by embedding similarity."""
+        if self.embedding_matrix is not None:
+            # Embeddings are normalized, so the dot product is the cosine similarity
+            query_embedding = np.asarray(self.embeddings.embed_query(query), dtype=np.float32)
+            scores = self.embedding_matrix @ query_embedding
+            if k < len(scores):
+                candidates = np.argpartition(scores, -k)[-k:]
+            else:
+                candidates = np.arange(len(scores))
+            return [int(chunk_id) for chunk_id in candidates[np.argsort(scores[candidates])[::-1]]]
+
+        if self.vector_db.count() == 0:
+            return []
+        results = self.vector_db.query(
+            query_embeddings=[self.embeddings.embed_query(query)],
+            n_results=min(k, self.vector_db.count()),
+            include=[],
         )
-        
-        print("✅ Hybrid search system ready (Semantic + BM25 + RRF)!")
+        return [int(chunk_id) for chunk_id in results["ids"][0]]
+
+    def _keyword_search(self, query, k):
+        """Return the ids of the k best BM25 matches."""
+        if self.bm25 is None:
+            return []
+        return self.bm25.top_k(bm25_tokenize(query), k)
 
     def search(self, query, k=10):
         """
@@ -104,26 +376,18 @@ class VectorStore:
         Returns:
             list[Document]: A list of the most similar documents after RRF reranking.
         """
-        if not self.hybrid_retriever:
+        if self.chunk_store is None:
             # Try to load persisted DB if available
-            if os.path.exists(self.db_path):
-                print("⚠️  Warning: BM25 index not available (requires fresh upload).")
-                print("    Falling back to semantic-only search...")
-                
-                # Fallback to semantic only
-                self.vector_db = Chroma(
-                    persist_directory=self.db_path, 
-                    embedding_function=self.embeddings
-                )
-                results = self.vector_db.similarity_search(query, k=k)
-                return results
-            else:
+            if not self.load_db():
                 raise ValueError("No database found. Please upload a PDF first.")
-        
+
         print(f"🔍 Hybrid searching for: '{query}'")
-        
-        # Use hybrid retriever (automatically applies RRF)
-        results = self.hybrid_retriever.invoke(query)
-        
-        # Return only top k results
-        return results[:k]
+
+        # Both legs return chunk ids; fuse them with RRF
+        fused_ids = reciprocal_rank_fusion(
+            [self._semantic_search(query, k), self._keyword_search(query, k)],
+            self.weights,
+        )
+
+        # Materialize Documents for the top k results only
+        return self.chunk_store.documents(fused_ids[:k])
@@ -0,0 +1,219 @@
+# ingest.py
+"""
+Bulk-ingest CLI for loading a whole directory tree of PDFs into the index.
+
+Usage: python -m ingest <dir> [--workers N] [--batch-size N] [--fresh]
+
+PDFs are parsed and split across a process pool, embedded in large batches,
+and written to the chunk store and Chroma in bulk transactions. Progress is
+checkpointed after every transaction, so re-running the same command after an
+interruption resumes where it stopped. Files added to the directory later are
+picked up by simply running the command again.
+
+New files are always added to the existing index (including one built through
+/upload or from another directory); pass --fresh to delete it and start over.
+"""
+
+import os
+import json
+import time
+import argparse
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from services.document_loader import DocumentLoader
+from utils.text_splitter import TextSplitter
+
+CHECKPOINT_FILE = "ingest_checkpoint.json"
+IN_FLIGHT_PER_WORKER = 2  # Parsed files allowed to queue up ahead of embedding, per worker
+
+# Per-worker instances, created once by _init_worker
+_document_loader: DocumentLoader = None
+_text_splitter: TextSplitter = None
+
+
+def _init_worker(root):
+    """Create the loader and splitter once per worker process."""
+    global _document_loader, _text_splitter
+    _document_loader = DocumentLoader(upload_dir=root)
+    _text_splitter = TextSplitter()
+
+
+def _parse_file(rel_path):
+    """
+    Load and split a single PDF inside a worker process.
+
+    Args:
+        rel_path (str): The path of the PDF relative to the ingest root.
+
+    Returns:
+        tuple[str, list[Document]]: The path and its chunks (empty on failure).
+    """
+    documents = _document_loader.load_pdf(rel_path)
+    if not documents:
+        return rel_path, []
+    return rel_path, _text_splitter.split_documents(documents)
+
+
+def find_pdfs(root):
+    """
+    Walk a directory tree and collect every PDF in it.
+
+    Args:
+        root (str): The directory to walk.
+
+    Returns:
+        list[str]: Sorted PDF paths, relative to root.
+    """
+    pdfs = []
+    for dir_path, _, file_names in os.walk(root):
+        for file_name in file_names:
+            if file_name.lower().endswith(".pdf"):
+                pdfs.append(os.path.relpath(os.path.join(dir_path, file_name), root))
+    return sorted(pdfs)
+
+
+def load_checkpoint(path):
+    """
+    Read the ingest checkpoint.
+
+    Returns:
+        dict | None: The checkpoint ({"done": [absolute PDF paths], "chunks": int}),
+        or None if no ingest has run against the current index.
+    """
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_checkpoint(path, checkpoint):
+    """Atomically write the ingest checkpoint."""
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(checkpoint, f)
+    os.replace(path + ".tmp", path)
+
+
+def ingest(root, workers=None, batch_size=512, fresh=False):
+    """
+    Ingest every PDF under root into the vector store.
+
+    Args:
+        root (str): The directory tree to ingest.
+        workers (int): Number of parser processes. Defaults to the CPU count.
+        batch_size (int): Chunks embedded and written per bulk transaction.
+        fresh (bool): Delete the existing index and rebuild it from scratch.
+            Otherwise new files are added to the existing index.
+    """
+    # Imported here rather than at module level: workers are spawned (not
+    # forked) and only re-import this module's top level, so they never load
+    # the embedding model or open Chroma
+    from core.vector_store import VectorStore
+
+    root = os.path.abspath(root)
+    vector_store = VectorStore()
+    checkpoint_path = os.path.join(vector_store.chunk_store_path, CHECKPOINT_FILE)
+
+    if fresh or not vector_store.open_db():
+        if fresh:
+            print("🧹 --fresh given: rebuilding the index from scratch.")
+        vector_store.reset_db()
+        checkpoint = None
+    else:
+        checkpoint = load_checkpoint(checkpoint_path)
+
+    if checkpoint is None:
+        # Start tracking from the current index (empty, or built via /upload)
+        checkpoint = {"done": [], "chunks": len(vector_store.chunk_store)}
+        save_checkpoint(checkpoint_path, checkpoint)
+        if checkpoint["chunks"]:
+            print(f"➕ Adding to the existing index of {checkpoint['chunks']} chunks.")
+    else:
+        # Roll back anything written after the last completed transaction
+        vector_store.truncate(checkpoint["chunks"])
+        print(f"♻️  Continuing from checkpoint: {len(checkpoint['done'])} files / {checkpoint['chunks']} chunks already indexed.")
+
+    # Track files by absolute path, so several directories can share one index
+    done = set(checkpoint["done"])
+    pending = [path for path in find_pdfs(root) if os.path.join(root, path) not in done]
+    print(f"📚 {len(pending)} PDFs to ingest from {root}")
+    if not pending:
+        return
+
+    start_time = time.perf_counter()
+    num_files = 0
+    num_chunks = 0
+    batch_files = []
+    batch_chunks = []
+
+    def commit():
+        """Write the current batch in one transaction and checkpoint it."""
+        nonlocal num_chunks
+        vector_store.add_documents(batch_chunks, batch_size=batch_size)
+        num_chunks += len(batch_chunks)
+        checkpoint["done"].extend(os.path.join(root, path) for path in batch_files)
+        checkpoint["chunks"] = len(vector_store.chunk_store)
+        save_checkpoint(checkpoint_path, checkpoint)
+
+        elapsed = time.perf_counter() - start_time
+        print(
+            f"⏱️  {num_files}/{len(pending)} files, {num_chunks} chunks in {elapsed:.1f}s "
+            f"({num_files / elapsed:.2f} files/s, {num_chunks / elapsed:.1f} chunks/s)"
+        )
+        batch_files.clear()
+        batch_chunks.clear()
+
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(root,),
+    ) as executor:
+        # Keep a bounded window of in-flight files so parsed documents can't
+        # pile up faster than they are embedded. Results are consumed in
+        # submission order, so chunk ids are deterministic.
+        remaining = iter(pending)
+        in_flight = deque()
+        for rel_path in remaining:
+            in_flight.append(executor.submit(_parse_file, rel_path))
+            if len(in_flight) >= workers * IN_FLIGHT_PER_WORKER:
+                break
+
+        while in_flight:
+            rel_path, chunks = in_flight.popleft().result()
+            next_path = next(remaining, None)
+            if next_path is not None:
+                in_flight.append(executor.submit(_parse_file, next_path))
+
+            num_files += 1
+            if not chunks:
+                print(f"⚠️  Skipping {rel_path}: no content could be loaded.")
+            batch_files.append(rel_path)
+            batch_chunks.extend(chunks)
+            if len(batch_chunks) >= batch_size:
+                commit()
+
+    if batch_files:
+        commit()
+
+    print(f"✅ Ingested {num_files} files ({num_chunks} chunks). Index holds {checkpoint['chunks']} chunks.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk-ingest a directory of PDFs into the index.")
+    parser.add_argument("directory", help="Directory tree containing the PDFs to ingest.")
+    parser.add_argument("--workers", type=int, default=None, help="Number of parser processes (default: CPU count).")
+    parser.add_argument("--batch-size", type=int, default=512, help="Chunks embedded and written per transaction.")
+    parser.add_argument("--fresh", action="store_true", help="Delete the existing index and rebuild it from scratch.")
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.directory):
+        parser.error(f"Not a directory: {args.directory}")
+
+    ingest(args.directory, workers=args.workers, batch_size=args.batch_size, fresh=args.fresh)
+
+
+if __name__ == "__main__":
+    main()
@@ -35,7 +35,7 @@ example_results = vector_store.search(rewritten_example)
 
 print("\n--- Sources Found ---")
 for i, res in enumerate(example_results):
-    print(f"[Source {i+1}] Page: {res.metadata.get('page', 'N/A')} | Source: {res.metadata.get('source', 'N/A')}")
+    print(f"[Source {i+1}] Page: {res.metadata.get('page', 'N/A')} | Source: {res.metadata.get('source_file', 'N/A')}")
     content_preview = res.page_content
     print(f"Content Preview: {content_preview}\n")
 
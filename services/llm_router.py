@@ -0,0 +1,192 @@
+# services/llm_router.py
+import time
+import threading
+from collections import deque
+from langchain_openai import ChatOpenAI
+from langchain_core.output_parsers import StrOutputParser
+from config.settings import Settings
+
+
+class RouteStats:
+    """Latency and error statistics for one provider/model pair."""
+
+    __slots__ = ("calls", "errors", "rate_limited", "ewma", "last_latency", "last_update", "window")
+
+    def __init__(self, window_size=100):
+        self.calls = 0
+        self.errors = 0
+        self.rate_limited = 0
+        self.ewma = None          # Exponentially weighted moving average latency (s)
+        self.last_latency = None
+        self.last_update = 0.0
+        self.window = deque(maxlen=window_size)  # Recent latencies for percentiles
+
+    def record(self, latency, alpha):
+        """Record the latency of a successful or timed out call."""
+        self.last_latency = latency
+        self.last_update = time.monotonic()
+        self.window.append(latency)
+        self.ewma = latency if self.ewma is None else alpha * latency + (1 - alpha) * self.ewma
+
+    def summary(self):
+        """Return the statistics as a plain dict (latencies in milliseconds)."""
+        ordered = sorted(self.window)
+
+        def percentile(p):
+            if not ordered:
+                return None
+            return round(ordered[min(len(ordered) - 1, int(p * len(ordered)))] * 1000, 1)
+
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "rate_limited": self.rate_limited,
+            "ewma_ms": None if self.ewma is None else round(self.ewma * 1000, 1),
+            "last_ms": None if self.last_latency is None else round(self.last_latency * 1000, 1),
+            "p50_ms": percentile(0.5),
+            "p95_ms": percentile(0.95),
+        }
+
+
+class Route:
+    """A single candidate (provider + model) for a task."""
+
+    __slots__ = ("provider", "model", "llm", "stats")
+
+    def __init__(self, provider, model, llm, stats):
+        self.provider = provider
+        self.model = model
+        self.llm = llm
+        self.stats = stats
+
+
+class LLMRouter:
+    """
+    Routes each LLM task to a provider/model, preferring fast and healthy ones.
+
+    Each task (e.g. "rewrite", "answer") has an ordered list of candidate
+    provider/model pairs in Settings.LLM_TASKS. For every call the router
+    tries, in order:
+    1. Candidates whose recent average latency is within the task's budget
+    2. Candidates that have recently been slower than the budget
+    3. Providers that are cooling down after a rate limit or error
+
+    Every provider speaks the OpenAI chat API, so base URLs can point at local
+    mock servers for testing.
+    """
+
+    def __init__(self, providers=None, tasks=None):
+        """
+        Initialize the router and create one chat client per candidate.
+
+        Args:
+            providers (dict): Provider name -> {"base_url", "api_key"}. Defaults to Settings.LLM_PROVIDERS.
+            tasks (dict): Task name -> routing config. Defaults to Settings.LLM_TASKS.
+        """
+        self.providers = providers if providers is not None else Settings.LLM_PROVIDERS
+        self.tasks = tasks if tasks is not None else Settings.LLM_TASKS
+        self.routes = {}
+        self.route_stats = {}     # (provider, model) -> RouteStats, shared across tasks
+        self.cooldown_until = {}  # provider -> monotonic time until which it is demoted
+        self._lock = threading.Lock()
+
+        for task, config in self.tasks.items():
+            routes = []
+            for provider, model in config["models"]:
+                provider_config = self.providers.get(provider)
+                if not provider_config or not provider_config.get("api_key"):
+                    print(f"⚠️  Skipping {provider}/{model} for '{task}': provider not configured.")
+                    continue
+                llm = ChatOpenAI(
+                    openai_api_key=provider_config["api_key"],
+                    openai_api_base=provider_config["base_url"],
+                    model_name=model,
+                    temperature=config.get("temperature", 0.7),
+                    timeout=config["timeout"],
+                    max_retries=0,  # The router handles fallback itself
+                )
+                stats = self.route_stats.setdefault((provider, model), RouteStats())
+                routes.append(Route(provider, model, llm, stats))
+            if not routes:
+                raise ValueError(f"No configured provider for LLM task '{task}'.")
+            self.routes[task] = routes
+
+    def _candidates(self, task):
+        """Order the task's routes by health and recent latency."""
+        now = time.monotonic()
+        budget = self.tasks[task]["latency_budget"]
+        healthy, slow, cooling = [], [], []
+        with self._lock:
+            for route in self.routes[task]:
+                stats = route.stats
+                if self.cooldown_until.get(route.provider, 0.0) > now:
+                    cooling.append(route)
+                elif (
+                    stats.ewma is not None
+                    and stats.ewma > budget
+                    and now - stats.last_update < Settings.llm_latency_window
+                ):
+                    slow.append(route)
+                else:
+                    healthy.append(route)
+        return healthy + slow + cooling
+
+    def invoke(self, task, prompt, inputs):
+        """
+        Run a prompt for a task, falling back across providers on failure.
+
+        Args:
+            task (str): The task name, e.g. "rewrite" or "answer".
+            prompt (ChatPromptTemplate): The prompt to run.
+            inputs (dict): The prompt variables.
+
+        Returns:
+            str: The model's response text.
+        """
+        last_error = None
+        for route in self._candidates(task):
+            start = time.perf_counter()
+            try:
+                response = (prompt | route.llm | StrOutputParser()).invoke(inputs)
+            except Exception as e:
+                latency = time.perf_counter() - start
+                rate_limited = getattr(e, "status_code", None) == 429
+                with self._lock:
+                    route.stats.calls += 1
+                    route.stats.errors += 1
+                    route.stats.rate_limited += int(rate_limited)
+                    # Timeouts count as (slow) latency samples; fast rejections don't
+                    if "Timeout" in type(e).__name__:
+                        route.stats.record(latency, Settings.llm_latency_alpha)
+                    self.cooldown_until[route.provider] = time.monotonic() + Settings.llm_cooldown
+                reason = "rate limited" if rate_limited else f"{type(e).__name__}: {e}"
+                print(f"⚠️  {route.provider}/{route.model} failed for '{task}' ({reason}), falling back...")
+                last_error = e
+                continue
+
+            latency = time.perf_counter() - start
+            with self._lock:
+                route.stats.calls += 1
+                route.stats.record(latency, Settings.llm_latency_alpha)
+            print(f"⚡ '{task}' served by {route.provider}/{route.model} in {latency:.2f}s")
+            return response
+
+        raise last_error
+
+    def stats(self):
+        """
+        Return per-provider latency and error statistics.
+
+        Returns:
+            dict: provider -> {"cooldown_remaining_s", "models": {model: stats}}.
+        """
+        now = time.monotonic()
+        summary = {}
+        with self._lock:
+            for (provider, model), stats in self.route_stats.items():
+                entry = summary.setdefault(provider, {
+                    "cooldown_remaining_s": round(max(0.0, self.cooldown_until.get(provider, 0.0) - now), 1),
+                    "models": {},
+                })
+                entry["models"][model] = stats.summary()
+        return summary
@@ -1,18 +1,13 @@
 # services/llm_service.py
-from langchain_openai import ChatOpenAI
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
-from langchain_core.output_parsers import StrOutputParser
 from langchain_community.chat_message_histories import ChatMessageHistory
-from config.settings import Settings
+from services.llm_router import LLMRouter
 
 class LLMService:
     def __init__(self):
-        self.llm = ChatOpenAI(
-            openai_api_key=Settings.OPENROUTER_API_KEY,
-            openai_api_base="https://openrouter.ai/api/v1",
-            model_name=Settings.llm_model,
-            temperature=0.7
-        )
+        # Routes "rewrite" to a small fast model and "answer" to the large one,
+        # with fallback across providers (see Settings.LLM_TASKS)
+        self.router = LLMRouter()
         # هنا بنعرف مخزن الذاكرة في الرام (دي بتتمسح لو قفلت البرنامج)
         self.history = ChatMessageHistory()
 
@@ -55,10 +50,8 @@ Your mission: Be a faithful mirror of the provided context. Do not let the user'
             ("user", "{query}")
         ])
         
-        chain = prompt | self.llm | StrOutputParser()
-
         # تشغيل الـ Chain مع تمرير التاريخ الحالي
-        response = chain.invoke({
+        response = self.router.invoke("answer", prompt, {
             "query": query,
             "context": context,
             "chat_history": self.history.messages
@@ -103,5 +96,4 @@ Your goal is to transform the user's question into a **highly detailed, descript
 Optimized Search Prompt:
         """
         prompt = ChatPromptTemplate.from_template(rewrite_template)
-        chain = prompt | self.llm | StrOutputParser()
-        return chain.invoke({"chat_history": chat_history, "query": query})
+        return self.router.invoke("rewrite", prompt, {"chat_history": chat_history, "query": query})
@@ -0,0 +1,99 @@
+import re
+
+HIGHLIGHT_OPEN = "**"
+HIGHLIGHT_CLOSE = "**"
+
+# Common English words that shouldn't be highlighted on their own
+STOPWORDS = frozenset("""
+a an and are as at be but by can could did do does for from had has have how if in into is it
+its not of on or so than that the their then there these they this those to was were what when
+where which who whom why will with would you your about explain describe
+""".split())
+
+
+def query_terms(*queries, min_length=3):
+    """
+    Extract the distinct search terms of one or more queries.
+
+    Args:
+        *queries (str): The query strings (e.g. original and rewritten query).
+        min_length (int): Ignore shorter terms such as "is" or "of".
+
+    Returns:
+        list[str]: Lowercased terms, longest first so longer matches win.
+    """
+    terms = set()
+    for query in queries:
+        for term in re.findall(r"[\w\-']+", query.lower()):
+            term = term.strip("-'")
+            if len(term) >= min_length and term not in STOPWORDS:
+                terms.add(term)
+    return sorted(terms, key=len, reverse=True)
+
+
+def make_snippet(text, terms, width=240):
+    """
+    Cut a highlighted window out of text around the densest cluster of terms.
+
+    Args:
+        text (str): The full chunk text.
+        terms (list[str]): The terms to look for, as returned by query_terms().
+        width (int): The approximate length of the window in characters.
+
+    Returns:
+        str: The window, with matched terms wrapped in HIGHLIGHT_OPEN/CLOSE and
+        "…" marking cut-off text. Falls back to the start of the text when no
+        term matches.
+    """
+    matches = []
+    if terms:
+        pattern = re.compile(
+            r"(?<!\w)(?:" + "|".join(re.escape(term) for term in terms) + r")(?!\w)",
+            re.IGNORECASE,
+        )
+        matches = [(m.start(), m.end()) for m in pattern.finditer(text)]
+
+    if len(text) <= width:
+        start, end = 0, len(text)
+    elif not matches:
+        start, end = 0, width
+    else:
+        # Pick the window starting at the match that covers the most matches
+        best, best_count, j = 0, 0, 0
+        for i, (match_start, _) in enumerate(matches):
+            j = max(j, i)
+            while j + 1 < len(matches) and matches[j + 1][1] <= match_start + width:
+                j += 1
+            if j - i + 1 > best_count:
+                best, best_count = i, j - i + 1
+        # Leave a little leading context before the first match
+        start = max(0, matches[best][0] - width // 5)
+        end = min(len(text), start + width)
+        start = max(0, end - width)
+
+    # Snap to word boundaries so words aren't cut in half
+    if start > 0:
+        space = text.find(" ", start)
+        if space != -1 and space < end:
+            start = space + 1
+    if end < len(text):
+        space = text.rfind(" ", start, end)
+        if space > start:
+            end = space
+
+    pieces = []
+    position = start
+    for match_start, match_end in matches:
+        if match_start < start or match_end > end:
+            continue
+        pieces.append(text[position:match_start])
+        pieces.append(HIGHLIGHT_OPEN + text[match_start:match_end] + HIGHLIGHT_CLOSE)
+        position = match_end
+    pieces.append(text[position:end])
+
+    snippet = "".join(pieces).strip()
+    if start > 0:
+        snippet = "…" + snippet
+    if end < len(text):
+        snippet = snippet + "…"
+    return snippet